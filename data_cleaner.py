@@ -1,128 +1,412 @@
-import pandas as pd
-import numpy as np
-
-class DataCleaner:
-    """数据清洗与质量检测核心模块"""
-    
-    def get_cols_to_check(self, df):
-        """获取应该参与查重的列（排除ID列）"""
-        # 简单的启发式规则：排除包含 'id', '编号', 'number' 且不仅包含重复值的列
-        # 这里为了稳健，先不自动排除，而是提供给用户选择，或者默认全部。
-        # 我们在 check_quality 里实现简单的自动排除逻辑供参考
-        cols = []
-        for col in df.columns:
-            col_lower = str(col).lower()
-            if 'id' in col_lower or '编号' in col_lower or '序号' in col_lower:
-                # 如果这一列是唯一的（像是ID），往往不应该参与重复行检查
-                if df[col].is_unique:
-                    continue
-            cols.append(col)
-        return cols if cols else df.columns.tolist()
-
-    def check_quality(self, df):
-        """
-        对数据进行健康检查
-        :return: 包含检测结果的字典
-        """
-        # 智能推断查重列（排除可能的ID列）
-        subset_cols = self.get_cols_to_check(df)
-        
-        # 1. 重复值检测
-        # keep=False 标记所有重复的行，keep='first' 标记除第一个外的
-        # 我们为了高亮，标记所有重复的组（包括第一行），这样用户能看到哪些是重复的
-        dup_mask = df.duplicated(subset=subset_cols, keep=False)
-        duplicate_indices = df[dup_mask].index.tolist()
-        
-        # 2. 缺失值检测
-        missing_mask = df.isnull().any(axis=1)
-        missing_indices = df[missing_mask].index.tolist()
-        
-        report = {
-            'n_rows': len(df),
-            'n_cols': len(df.columns),
-            'subset_cols': subset_cols, # 实际用于查重的列
-            'duplicates': len(duplicate_indices), # 注意：这里统计的是所有涉嫌重复的行数
-            'duplicate_indices': duplicate_indices,
-            'missing_count': df.isnull().sum().sum(),
-            'missing_indices': missing_indices,
-            'missing_details': df.isnull().sum()[df.isnull().sum() > 0].to_dict(),
-            'outliers': {} # 仅检测数值列
-        }
-        
-        # 3. 异常值检测
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            q1 = df[col].quantile(0.25)
-            q3 = df[col].quantile(0.75)
-            iqr = q3 - q1
-            outlier_condition = ((df[col] < (q1 - 1.5 * iqr)) | (df[col] > (q3 + 1.5 * iqr)))
-            n_outliers = outlier_condition.sum()
-            if n_outliers > 0:
-                report['outliers'][col] = n_outliers
-                
-        return report
-    
-    def apply_cleaning(self, df, config):
-        """
-        根据配置应用清洗策略
-        :param df: 原始 DataFrame
-        :param config: 清洗配置字典
-        :return: 清洗后的 DataFrame, 操作日志
-        """
-        df_clean = df.copy()
-        logs = []
-        
-        # 1. 处理重复值
-        if config.get('remove_duplicates'):
-            subset = config.get('duplicate_subset') # 如果没有指定，默认None(所有列)
-            
-            n_before = len(df_clean)
-            # keep='first' 保留第一个，删除后面的
-            df_clean.drop_duplicates(subset=subset, keep='first', inplace=True)
-            n_dropped = n_before - len(df_clean)
-            
-            if n_dropped > 0:
-                cols_str = "所有列" if subset is None else f"排除ID列 ({len(subset)}列)"
-                logs.append(f"✅ 已删除 {n_dropped} 行重复数据 (依据: {cols_str})")
-        
-        # 2. 处理缺失值
-        if config.get('handle_missing'):
-            method = config.get('missing_method', 'mean') # mean, median, drop
-            
-            if method == 'drop':
-                n_before = len(df_clean)
-                df_clean.dropna(inplace=True)
-                n_dropped = n_before - len(df_clean)
-                if n_dropped > 0:
-                    logs.append(f"✅ 已删除 {n_dropped} 行包含缺失值的记录")
-            else:
-                # 填充策略
-                numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
-                filled_count = 0
-                
-                for col in df_clean.columns:
-                    if df_clean[col].isnull().sum() > 0:
-                        if col in numeric_cols:
-                            if method == 'mean':
-                                fill_val = df_clean[col].mean()
-                                method_str = "均值"
-                            else: # median
-                                fill_val = df_clean[col].median()
-                                method_str = "中位数"
-                            df_clean[col].fillna(fill_val, inplace=True)
-                        else:
-                            # 非数值列默认用众数填充
-                            if not df_clean[col].mode().empty:
-                                fill_val = df_clean[col].mode()[0]
-                            else:
-                                fill_val = "Unknown"
-                            method_str = "众数"
-                            df_clean[col].fillna(fill_val, inplace=True)
-                        filled_count += 1
-                        
-                if filled_count > 0:
-                    logs.append(f"✅ 已对 {filled_count} 个列进行了缺失值填充 ({method_str})")
-
-        # 重置索引，防止后续处理索引不连续
-        df_clean.reset_index(drop=True, inplace=True)
-        return df_clean, logs
+import warnings
+import weakref
+
+import pandas as pd
+import numpy as np
+
+# Polars 是可选的加速依赖：装了就用它跑清洗流水线(并行列式执行)，没装则回退到 pandas
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Numba 可选依赖：纯数值表的查重用JIT过的行哈希核，绕开 pandas 逐列factorize的开销
+try:
+    from numba import njit, prange, types
+    from numba.typed import Dict as NumbaDict
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True, parallel=True)
+    def _row_hashes(bits):
+        """
+        对每一行的64位原始比特做哈希，行间并行。
+        每个字先过一遍 splitmix64 终混器再按FNV方式折叠：直接对整字做
+        FNV-1a 时，浮点小整数只在高位(指数/尾数顶端)有差异，单次乘法
+        会把这些差异推出字外，[0,0]/[2,2] 这类行会整批撞在一起。
+        """
+        n, m = bits.shape
+        out = np.empty(n, dtype=np.uint64)
+        for i in prange(n):
+            h = np.uint64(0xcbf29ce484222325)
+            for j in range(m):
+                z = bits[i, j] + np.uint64(0x9E3779B97F4A7C15)
+                z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+                z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+                z = z ^ (z >> np.uint64(31))
+                h = (h ^ z) * np.uint64(0x100000001b3)
+            out[i] = h
+        return out
+
+    @njit(cache=True)
+    def _dup_mask_from_hashes(hashes, bits):
+        """
+        根据行哈希一次性产出两个掩码：
+        mask_all 等价于 duplicated(keep=False)，mask_first 等价于 keep='first'。
+        哈希相同但行内容不同时做开放寻址——换一个槽位继续探测，而不是
+        整趟作废回退 pandas；内容相同的行哈希必相同，探测序列也相同，
+        所以结果始终精确。
+        """
+        n = hashes.shape[0]
+        mask_all = np.zeros(n, dtype=np.bool_)
+        mask_first = np.zeros(n, dtype=np.bool_)
+        first = NumbaDict.empty(types.uint64, types.int64)
+        for i in range(n):
+            h = hashes[i]
+            while True:
+                if h in first:
+                    j = first[h]
+                    same = True
+                    for k in range(bits.shape[1]):
+                        if bits[i, k] != bits[j, k]:
+                            same = False
+                            break
+                    if same:
+                        mask_all[i] = True
+                        mask_all[j] = True
+                        mask_first[i] = True
+                        break
+                    # 真碰撞：顺着固定步长找下一个槽位
+                    h = h + np.uint64(0x9E3779B97F4A7C15)
+                else:
+                    first[h] = i
+                    break
+        return mask_all, mask_first
+
+    @njit(cache=True, parallel=True)
+    def _outlier_counts(arr, lower, upper):
+        """
+        单遍统计每列落在 [lower, upper] 之外的元素个数
+        把比较和求和融合在一次遍历里，不生成 (arr<lo)|(arr>hi) 的中间布尔矩阵；
+        NaN 与任何界比较都是False，自然不计入，与numpy实现一致。
+        """
+        n, m = arr.shape
+        counts = np.zeros(m, dtype=np.int64)
+        for j in prange(m):
+            c = 0
+            for i in range(n):
+                v = arr[i, j]
+                if v < lower[j] or v > upper[j]:
+                    c += 1
+            counts[j] = c
+        return counts
+
+class DataCleaner:
+    """数据清洗与质量检测核心模块"""
+
+    def __init__(self):
+        # select_dtypes 每次都要遍历所有列重建Index，宽表下开销可观，这里按帧缓存
+        self._numeric_cols_cache = None
+
+    def _get_numeric_cols(self, df):
+        """获取数值列列表 (同一个DataFrame只推断一次)"""
+        # 弱引用做身份校验：单凭 id(df) 不可靠——旧帧被回收后新帧可能
+        # 复用同一地址；弱引用解出来还是同一个对象才算命中
+        cached = self._numeric_cols_cache
+        if cached is not None and cached[0]() is df:
+            return cached[1]
+        # 直接扫 dtypes 的kind即可 (整型/无符号/浮点/复数)，
+        # 不必让 select_dtypes 重建整个BlockManager再抽列名
+        cols = [col for col, dt in df.dtypes.items() if dt.kind in 'iufc']
+        # 只保留最近一帧的结果，避免缓存随加载的文件数无限增长
+        self._numeric_cols_cache = (weakref.ref(df), cols)
+        return cols
+
+    def _find_duplicate_rows(self, df, subset_cols):
+        """
+        一次重复检测同时产出两个布尔数组：
+        (keep=False 的全组掩码, keep='first' 的待删行掩码)
+        后者随体检报告传给 apply_cleaning，去重时就不用再哈希一遍全表。
+        纯数值子集走 Numba 行哈希核 (单遍扫描、行间并行)，
+        混合/非数值子集回退到 pandas 实现。
+        """
+        # 快速路径：单列子集且该列取值唯一，必然没有重复行
+        if len(subset_cols) == 1 and df[subset_cols[0]].is_unique:
+            empty = np.zeros(len(df), dtype=bool)
+            return empty, empty
+
+        if njit is not None and subset_cols and all(
+                isinstance(df[c].dtype, np.dtype) and df[c].dtype.kind in 'iuf'
+                for c in subset_cols):
+            # 逐列取64位比特：整数列零/符号扩展后原样保留——经 float64 中转
+            # 会把 2^53 以上的int64压成同一个值，不同的行会被误判成重复；
+            # 浮点列在副本上统一NaN比特、把-0.0折叠成0.0，
+            # 让比特级相等与数值相等一致 (可空/复数等dtype走下面的精确回退)
+            bits = np.empty((len(df), len(subset_cols)), dtype=np.uint64)
+            for j, c in enumerate(subset_cols):
+                a = df[c].to_numpy()
+                if a.dtype.kind == 'f':
+                    a = a.astype(np.float64)  # 宽化无损，且保证是副本
+                    a[np.isnan(a)] = np.nan
+                    a[a == 0.0] = 0.0
+                    bits[:, j] = a.view(np.uint64)
+                elif a.dtype.kind == 'u':
+                    bits[:, j] = a.astype(np.uint64)
+                else:
+                    bits[:, j] = a.astype(np.int64).view(np.uint64)
+            return _dup_mask_from_hashes(_row_hashes(bits), bits)
+
+        # 混合/宽表回退：hash_pandas_object 逐列在C层哈希再归并成每行uint64，
+        # 远快于 duplicated 对object列走Python层比较。
+        # 浮点列先做与上面相同的比特规范化 (-0.0折叠成0.0、统一NaN比特)：
+        # hash_pandas_object 按比特哈希，而 duplicated 按数值判等，
+        # 不规范化的话 [-0.0, 4.0] 这类行会被当成哈希唯一而漏检。
+        # 规范化之后哈希唯一的行必不重复；
+        # 只对哈希撞在一起的候选行做一次精确 duplicated，杜绝碰撞误判
+        n = len(df)
+        to_hash = df[subset_cols]
+        float_cols = [c for c, dt in to_hash.dtypes.items() if dt.kind == 'f']
+        if float_cols:
+            to_hash = to_hash.copy()
+            farr = to_hash[float_cols].to_numpy(dtype=np.float64, copy=True)
+            farr[np.isnan(farr)] = np.nan
+            farr[farr == 0.0] = 0.0
+            to_hash[float_cols] = farr
+        h = pd.util.hash_pandas_object(to_hash, index=False).to_numpy()
+        cand = pd.Series(h).duplicated(keep=False).to_numpy()
+        if not cand.any():
+            empty = np.zeros(n, dtype=bool)
+            return empty, empty
+
+        cand_pos = np.flatnonzero(cand)
+        sub = df[subset_cols].iloc[cand_pos]
+        first_sub = sub.duplicated().to_numpy()
+        mask_first = np.zeros(n, dtype=bool)
+        mask_all = np.zeros(n, dtype=bool)
+        if first_sub.any():
+            mask_first[cand_pos] = first_sub
+            mask_all[cand_pos] = sub.duplicated(keep=False).to_numpy()
+        return mask_all, mask_first
+
+    def get_cols_to_check(self, df):
+        """获取应该参与查重的列（排除ID列）"""
+        # 简单的启发式规则：排除包含 'id', '编号', 'number' 且不仅包含重复值的列
+        # 这里为了稳健，先不自动排除，而是提供给用户选择，或者默认全部。
+        # 我们在 check_quality 里实现简单的自动排除逻辑供参考
+        # 列名匹配用一次向量化的正则完成；is_unique 是 O(n) 的，
+        # 只对名字像ID的候选列做，而不是每一列都查
+        name_mask = df.columns.astype(str).str.contains(r'id|编号|序号', case=False, regex=True)
+        # 如果疑似ID列的取值是唯一的（像是ID），往往不应该参与重复行检查
+        drop = {col for col, is_id in zip(df.columns, name_mask) if is_id and df[col].is_unique}
+        cols = [col for col in df.columns if col not in drop]
+        return cols if cols else df.columns.tolist()
+
+    def check_quality(self, df):
+        """
+        对数据进行健康检查
+        :return: 包含检测结果的字典
+        """
+        # 智能推断查重列（排除可能的ID列）
+        subset_cols = self.get_cols_to_check(df)
+        
+        # 1. 重复值检测
+        # keep=False 标记所有重复的行，keep='first' 标记除第一个外的
+        # 我们为了高亮，标记所有重复的组（包括第一行），这样用户能看到哪些是重复的
+        dup_arr, dup_first_arr = self._find_duplicate_rows(df, subset_cols)
+        # 只读索引即可，不要用布尔索引把所有列都复制一遍；无重复时直接短路
+        # 索引保持ndarray形式，几百万重复行时不必逐个装箱成Python list
+        n_duplicates = int(dup_arr.sum())
+        if n_duplicates > 0:
+            duplicate_indices = df.index.to_numpy()[np.flatnonzero(dup_arr)]
+        else:
+            duplicate_indices = np.empty(0, dtype=np.int64)
+        
+        # 2. 缺失值检测
+        # 数值块直接在底层ndarray上跑 np.isnan (连续float64上是SIMD化的单遍扫描)，
+        # 只有剩下的 object/日期等列才走 pandas 通用的 isnull()
+        num_cols = self._get_numeric_cols(df)
+        num_set = set(num_cols)
+        other_cols = [c for c in df.columns if c not in num_set]
+
+        row_has_null = np.zeros(len(df), dtype=bool)
+        col_null_counts = {}
+        if num_cols:
+            num_null = np.isnan(df[num_cols].to_numpy(dtype=np.float64, copy=False))
+            row_has_null |= num_null.any(axis=1)
+            col_null_counts.update(zip(num_cols, num_null.sum(axis=0).tolist()))
+        if other_cols:
+            obj_null = df[other_cols].isnull()
+            row_has_null |= obj_null.any(axis=1).to_numpy()
+            col_null_counts.update(obj_null.sum().to_dict())
+
+        missing_indices = df.index.to_numpy()[np.flatnonzero(row_has_null)]
+
+        report = {
+            'n_rows': len(df),
+            'n_cols': len(df.columns),
+            'subset_cols': subset_cols, # 实际用于查重的列
+            'duplicates': n_duplicates, # 注意：这里统计的是所有涉嫌重复的行数
+            'duplicate_indices': duplicate_indices,
+            # keep='first' 掩码：应用清洗时直接按它删行，避免重新哈希全表
+            'duplicate_first_mask': dup_first_arr,
+            'missing_count': int(sum(col_null_counts.values())),
+            'missing_indices': missing_indices,
+            # 按原始列顺序给出缺失明细
+            'missing_details': {c: int(col_null_counts[c]) for c in df.columns
+                                if col_null_counts.get(c, 0) > 0},
+            'outliers': {} # 仅检测数值列
+        }
+        
+        # 3. 异常值检测 (IQR规则)
+        # 一次性对整个数值块求分位数，避免逐列调用 quantile 触发的重复排序
+        numeric_df = df[self._get_numeric_cols(df)]
+        if numeric_df.shape[1] > 0:
+            arr = numeric_df.to_numpy(dtype=np.float64, copy=False)
+            with warnings.catch_warnings():
+                # 全NaN的列会触发 All-NaN slice 警告，结果是NaN，与逐列计算时一致
+                warnings.simplefilter('ignore', category=RuntimeWarning)
+                q1, q3 = np.nanquantile(arr, [0.25, 0.75], axis=0)
+            iqr = q3 - q1
+            lower = q1 - 1.5 * iqr
+            upper = q3 + 1.5 * iqr
+            if njit is not None:
+                # 融合核：一次遍历完成比较+计数，省掉两个整块布尔临时数组
+                outlier_counts = _outlier_counts(np.ascontiguousarray(arr), lower, upper)
+            else:
+                outlier_counts = np.sum((arr < lower) | (arr > upper), axis=0)
+            for col, n_outliers in zip(numeric_df.columns, outlier_counts):
+                if n_outliers > 0:
+                    report['outliers'][col] = int(n_outliers)
+
+        return report
+    
+    def apply_cleaning(self, df, config, copy=True):
+        """
+        根据配置应用清洗策略
+        :param df: 原始 DataFrame
+        :param config: 清洗配置字典
+        :param copy: 是否先深拷贝一份再操作。调用方不再需要原始df时传False，
+                     可以省掉一次整表拷贝 (清洗操作本身都是非原位的，不会改动传入对象)
+        :return: 清洗后的 DataFrame, 操作日志
+        """
+        # 优先走 Polars 路径：去重/删行/填充都是全表操作，列式并行执行快得多
+        # 个别特殊dtype转换失败时回退到 pandas 路径，保证功能不受影响
+        if pl is not None:
+            try:
+                return self._apply_cleaning_polars(df, config)
+            except Exception:
+                pass
+
+        # 非原位操作 + pandas 写时复制(CoW)会让未改动的列共享内存，
+        # 所以 copy=False 时直接引用原df也是安全的
+        df_clean = df.copy() if copy else df
+        logs = []
+
+        # 1. 处理重复值
+        if config.get('remove_duplicates'):
+            subset = config.get('duplicate_subset') # 如果没有指定，默认None(所有列)
+
+            n_before = len(df_clean)
+            # keep='first' 保留第一个，删除后面的
+            # 体检阶段已经算好掩码的话直接用，免去第二次全表哈希
+            dup_mask = config.get('duplicate_mask')
+            if dup_mask is not None and len(dup_mask) == n_before:
+                df_clean = df_clean.loc[~np.asarray(dup_mask)]
+            else:
+                df_clean = df_clean.drop_duplicates(subset=subset, keep='first')
+            n_dropped = n_before - len(df_clean)
+            
+            if n_dropped > 0:
+                cols_str = "所有列" if subset is None else f"排除ID列 ({len(subset)}列)"
+                logs.append(f"✅ 已删除 {n_dropped} 行重复数据 (依据: {cols_str})")
+        
+        # 2. 处理缺失值
+        if config.get('handle_missing'):
+            method = config.get('missing_method', 'mean') # mean, median, drop
+            
+            if method == 'drop':
+                n_before = len(df_clean)
+                df_clean = df_clean.dropna()
+                n_dropped = n_before - len(df_clean)
+                if n_dropped > 0:
+                    logs.append(f"✅ 已删除 {n_dropped} 行包含缺失值的记录")
+            else:
+                # 填充策略：先一次性算出所有列的填充值，再用单次 fillna 完成
+                # 避免逐列 isnull().sum() + fillna 造成的 O(n_cols) 次全列扫描
+                null_cols = df_clean.columns[df_clean.isnull().any().to_numpy()]
+                numeric_cols = set(self._get_numeric_cols(df_clean))
+
+                method_str = "均值" if method == 'mean' else "中位数"
+                fill_values = {}
+
+                num_null = [c for c in null_cols if c in numeric_cols]
+                if num_null:
+                    if method == 'mean':
+                        fill_values.update(df_clean[num_null].mean().to_dict())
+                    else: # median
+                        fill_values.update(df_clean[num_null].median().to_dict())
+
+                for col in null_cols:
+                    if col in numeric_cols:
+                        continue
+                    # 非数值列默认用众数填充
+                    # mode() 会排序并返回全部众数，这里只要最高频的那个：
+                    # value_counts 一遍哈希计数 + idxmax 即可，不排序不建多余Series
+                    counts = df_clean[col].value_counts(dropna=True, sort=False)
+                    fill_values[col] = counts.idxmax() if not counts.empty else "Unknown"
+                    method_str = "众数"
+
+                if fill_values:
+                    df_clean = df_clean.fillna(value=fill_values)
+                    logs.append(f"✅ 已对 {len(fill_values)} 个列进行了缺失值填充 ({method_str})")
+
+        # 重置索引，防止后续处理索引不连续
+        df_clean = df_clean.reset_index(drop=True)
+        return df_clean, logs
+
+    def _apply_cleaning_polars(self, df, config):
+        """apply_cleaning 的 Polars 实现，语义与 pandas 路径保持一致"""
+        pl_df = pl.from_pandas(df)
+        logs = []
+
+        # 1. 处理重复值
+        if config.get('remove_duplicates'):
+            subset = config.get('duplicate_subset')
+
+            n_before = pl_df.height
+            # 体检阶段算好的 keep='first' 掩码优先，省一次全表哈希
+            dup_mask = config.get('duplicate_mask')
+            if dup_mask is not None and len(dup_mask) == n_before:
+                pl_df = pl_df.filter(pl.Series(~np.asarray(dup_mask)))
+            else:
+                pl_df = pl_df.unique(subset=subset, keep='first', maintain_order=True)
+            n_dropped = n_before - pl_df.height
+
+            if n_dropped > 0:
+                cols_str = "所有列" if subset is None else f"排除ID列 ({len(subset)}列)"
+                logs.append(f"✅ 已删除 {n_dropped} 行重复数据 (依据: {cols_str})")
+
+        # 2. 处理缺失值
+        if config.get('handle_missing'):
+            method = config.get('missing_method', 'mean')
+
+            if method == 'drop':
+                n_before = pl_df.height
+                pl_df = pl_df.drop_nulls()
+                n_dropped = n_before - pl_df.height
+                if n_dropped > 0:
+                    logs.append(f"✅ 已删除 {n_dropped} 行包含缺失值的记录")
+            else:
+                # 填充策略：数值列用均值/中位数，其余列用众数
+                method_str = "均值" if method == 'mean' else "中位数"
+                fill_exprs = []
+                for col, dtype in zip(pl_df.columns, pl_df.dtypes):
+                    if pl_df[col].null_count() == 0:
+                        continue
+                    if dtype.is_numeric():
+                        fill_val = pl_df[col].mean() if method == 'mean' else pl_df[col].median()
+                    else:
+                        modes = pl_df[col].drop_nulls().mode()
+                        fill_val = modes[0] if len(modes) > 0 else "Unknown"
+                        method_str = "众数"
+                    fill_exprs.append(pl.col(col).fill_null(fill_val))
+
+                if fill_exprs:
+                    pl_df = pl_df.with_columns(fill_exprs)
+                    logs.append(f"✅ 已对 {len(fill_exprs)} 个列进行了缺失值填充 ({method_str})")
+
+        # to_pandas() 本身就返回全新的连续索引
+        return pl_df.to_pandas(), logs
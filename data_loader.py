@@ -1,31 +1,97 @@
-import pandas as pd
-import os
-
-class DataLoader:
-    def load_file(self, file_path):
-        """
-        加载Excel或CSV文件
-        :param file_path: 文件绝对路径
-        :return: pandas DataFrame
-        """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"文件未找到: {file_path}")
-            
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        try:
-            if ext in ['.xlsx', '.xls']:
-                # 默认读取第一个sheet
-                df = pd.read_excel(file_path)
-            elif ext == '.csv':
-                df = pd.read_csv(file_path)
-            else:
-                raise ValueError(f"不支持的文件格式: {ext}")
-                
-            if df.empty:
-                raise ValueError("文件为空")
-                
-            return df
-            
-        except Exception as e:
-            raise Exception(f"读取文件出错: {str(e)}")
+import pandas as pd
+import glob
+import os
+
+# Polars 可选依赖：用于大CSV的惰性预览（只物化前N行，不整表解析）
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+class DataLoader:
+    def load_file(self, file_path):
+        """
+        加载Excel或CSV文件
+        :param file_path: 文件绝对路径
+        :return: pandas DataFrame
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"文件未找到: {file_path}")
+
+        ext = os.path.splitext(file_path)[1].lower()
+
+        try:
+            if ext in ['.xlsx', '.xls']:
+                df = self._load_excel_cached(file_path)
+            elif ext == '.csv':
+                # pyarrow 引擎是多线程解析，大文件明显更快；不可用时回退C引擎
+                try:
+                    df = pd.read_csv(file_path, engine='pyarrow')
+                except Exception:
+                    df = pd.read_csv(file_path)
+            else:
+                raise ValueError(f"不支持的文件格式: {ext}")
+
+            if df.empty:
+                raise ValueError("文件为空")
+
+            return df
+
+        except Exception as e:
+            raise Exception(f"读取文件出错: {str(e)}")
+
+    def _load_excel_cached(self, file_path):
+        """
+        读取Excel，并在文件旁维护一个Parquet缓存
+        Excel的XML解析往往比读同内容的Parquet慢50-100倍，第二次打开同一个
+        文件时直接读缓存。缓存文件名带mtime，源文件被修改后自动失效。
+        缓存读写失败时静默回退到直接解析，不影响功能。
+        """
+        cache_path = None
+        try:
+            mtime = int(os.path.getmtime(file_path))
+            cache_path = f"{file_path}.{mtime}.parquet"
+            if os.path.exists(cache_path):
+                return pd.read_parquet(cache_path, engine='pyarrow')
+        except Exception:
+            cache_path = None
+
+        # 默认读取第一个sheet
+        # calamine 解析Excel比openpyxl快5-10倍，没装或解析失败则走默认引擎
+        try:
+            df = pd.read_excel(file_path, engine='calamine')
+        except Exception:
+            df = pd.read_excel(file_path)
+
+        if cache_path is not None:
+            try:
+                # 顺手清掉同一文件旧mtime的缓存
+                for old in glob.glob(f"{glob.escape(file_path)}.*.parquet"):
+                    if old != cache_path:
+                        os.remove(old)
+                df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+            except Exception:
+                pass
+
+        return df
+
+    def load_preview(self, file_path, n=1000):
+        """
+        惰性加载CSV前n行用于预览
+        大文件只需要展示前1000行时，没必要把整个文件解析进内存；
+        Polars 的 scan_csv 是惰性扫描，head(n) 会下推到读取端，只解析需要的部分。
+        :param file_path: 文件绝对路径
+        :param n: 预览行数
+        :return: pandas DataFrame (最多n行)
+        """
+        ext = os.path.splitext(file_path)[1].lower()
+
+        if ext == '.csv' and pl is not None:
+            try:
+                return pl.scan_csv(file_path).head(n).collect().to_pandas()
+            except Exception:
+                pass
+
+        # Excel 没有可靠的惰性读取方式，其余情况直接走完整加载后截断
+        df = self.load_file(file_path)
+        return df.head(n)
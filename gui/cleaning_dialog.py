@@ -135,6 +135,8 @@ class CleaningDialog(QDialog):
             # 传递查重依据列
             if self.chk_dupes.isChecked():
                 self.config['duplicate_subset'] = self.report['subset_cols']
+                # 体检时算好的 keep='first' 掩码，清洗时可直接按它删行
+                self.config['duplicate_mask'] = self.report.get('duplicate_first_mask')
         else:
             self.config['remove_duplicates'] = False
             
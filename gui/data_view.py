@@ -1,54 +1,118 @@
-from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView
-from PyQt5.QtCore import Qt
-
-class DataView(QTableWidget):
-    def __init__(self):
-        super().__init__()
-        self.setAlternatingRowColors(True)
-        self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
-        self.verticalHeader().setVisible(True)
-        
-    def load_data(self, df):
-        """加载pandas DataFrame到表格中"""
-        self.setRowCount(df.shape[0])
-        self.setColumnCount(df.shape[1])
-        self.setHorizontalHeaderLabels(df.columns.astype(str))
-        
-        # 为了性能，只显示前1000行（如果数据量大的话，后续可以优化为分页或懒加载）
-        # MVP阶段简单处理，如果行数太多截断显示或者全部显示（注意性能）
-        # 这里暂时显示全部，如果卡顿后续优化
-        
-        # 考虑到性能，如果超过1000行，先只显示前1000行并在表头提示
-        display_rows = min(1000, df.shape[0])
-        self.setRowCount(display_rows)
-        
-        for i in range(display_rows):
-            for j in range(df.shape[1]):
-                value = df.iloc[i, j]
-                # 格式化显示
-                if isinstance(value, float):
-                    item = QTableWidgetItem(f"{value:.4f}")
-                else:
-                    item = QTableWidgetItem(str(value))
-                
-                item.setFlags(item.flags() ^ Qt.ItemIsEditable) # 只读
-                self.setItem(i, j, item)
-        
-        if df.shape[0] > 1000:
-            print(f"提示: 仅显示前1000行数据预览 (共 {df.shape[0]} 行)")
-
-    def highlight_rows(self, row_indices, color):
-        """
-        高亮显示指定的行
-        :param row_indices: 行索引列表
-        :param color: QColor 对象
-        """
-        # 清除之前的背景色 (重置为交替色)
-        # 但这里为了简单，只覆盖颜色。如果需要重置，应该重新load_data
-        
-        for row in row_indices:
-            if row >= self.rowCount(): continue
-            for col in range(self.columnCount()):
-                item = self.item(row, col)
-                if item:
-                    item.setBackground(color)
+import numpy as np
+import pandas as pd
+from PyQt5.QtWidgets import QTableView, QHeaderView
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush
+
+
+class DataFrameModel(QAbstractTableModel):
+    """
+    直接以numpy矩阵为后端的只读表格模型
+    Qt 只会对可见区域调用 data()，所以加载开销与数据行数无关，
+    也不再需要为每个单元格预先构造 QTableWidgetItem (此前上限1000行的原因)。
+    """
+
+    def __init__(self, df, parent=None):
+        super().__init__(parent)
+        self._bind(df)
+
+    def _bind(self, df):
+        """换绑后端数据 (只是指针替换，不逐格搬数据)"""
+        self._arr = df.to_numpy()
+        self._cols = df.columns.astype(str).tolist()
+        self._row_labels = [str(idx) for idx in df.index]
+        self._is_float = [dt.kind == 'f' for dt in df.dtypes]
+        # 行高亮色 (行号 -> QColor)，由 DataView.highlight_rows 填充
+        self._row_colors = {}
+
+    def set_dataframe(self, df):
+        """整体换数据：一次模型reset，视图按新数据惰性重取可见区域"""
+        self.beginResetModel()
+        self._bind(df)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._arr.shape[0]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._arr.shape[1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.DisplayRole:
+            value = self._arr[index.row(), index.column()]
+            # 格式化显示 (浮点统一保留4位小数)
+            if self._is_float[index.column()] or isinstance(value, float):
+                return f"{value:.4f}"
+            return str(value)
+
+        if role == Qt.BackgroundRole:
+            color = self._row_colors.get(index.row())
+            if color is not None:
+                return QBrush(color)
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._cols[section]
+        return self._row_labels[section]
+
+    def set_row_colors(self, row_indices, color):
+        """批量设置行背景色并一次性通知视图刷新"""
+        self.set_row_color_map({row: color for row in row_indices})
+
+    def set_row_color_map(self, color_map):
+        """一次性换入整张 行号->QColor 映射，之后 data() 按行查表取色"""
+        n_rows = self._arr.shape[0]
+        rows = [r for r in color_map if 0 <= r < n_rows]
+        if not rows:
+            return
+        for row in rows:
+            self._row_colors[row] = color_map[row]
+        self.dataChanged.emit(
+            self.index(min(rows), 0),
+            self.index(max(rows), self._arr.shape[1] - 1),
+            [Qt.BackgroundRole],
+        )
+
+
+class DataView(QTableView):
+    def __init__(self):
+        super().__init__()
+        self.setAlternatingRowColors(True)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.verticalHeader().setVisible(True)
+        self.setEditTriggers(QTableView.NoEditTriggers)  # 只读
+        self._model = None
+
+    def load_data(self, df):
+        """加载pandas DataFrame到表格中"""
+        if self._model is None:
+            self._model = DataFrameModel(df, self)
+            self.setModel(self._model)
+        else:
+            # 复用既有模型：begin/endResetModel 包一次指针交换，
+            # 不再重建模型对象、也不触发视图与模型的重新挂接
+            self._model.set_dataframe(df)
+
+    def highlight_rows(self, row_indices, color):
+        """
+        高亮显示指定的行
+        :param row_indices: 行索引列表
+        :param color: QColor 对象
+        """
+        if self._model is not None:
+            self._model.set_row_colors(row_indices, color)
+
+    def highlight_rows_batch(self, color_map):
+        """
+        按 行号->QColor 映射批量高亮，只触发一次刷新
+        :param color_map: dict[int, QColor]
+        """
+        if self._model is not None:
+            self._model.set_row_color_map(color_map)
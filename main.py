@@ -1,24 +1,26 @@
-import sys
-import os
-from PyQt5.QtWidgets import QApplication
-from gui.main_window import MainWindow
-
-def main():
-    # 设置高DPI支持
-    if hasattr(sys, 'set_int_max_str_digits'):
-        sys.set_int_max_str_digits(0)
-    
-    os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
-    
-    app = QApplication(sys.argv)
-    
-    # 设置应用程序样式
-    app.setStyle("Fusion")
-    
-    window = MainWindow()
-    window.show()
-    
-    sys.exit(app.exec_())
-
-if __name__ == "__main__":
-    main()
+import sys
+import os
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+from gui.main_window import MainWindow
+
+def main():
+    # 设置高DPI支持 (必须在QApplication创建前设置)
+    # 按设备像素比整体缩放并使用高清图标，避免Qt回退到位图拉伸重绘
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+    os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
+    os.environ.setdefault("QT_ENABLE_HIGHDPI_SCALING", "1")
+    
+    app = QApplication(sys.argv)
+    
+    # 设置应用程序样式
+    app.setStyle("Fusion")
+    
+    window = MainWindow()
+    window.show()
+    
+    sys.exit(app.exec_())
+
+if __name__ == "__main__":
+    main()
@@ -1,81 +1,145 @@
-import pandas as pd
-import numpy as np
-from scipy import stats
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
-
-def one_way_anova(df, group_col, value_col):
-    """
-    执行单因素方差分析 (One-way ANOVA)
-    :param df: DataFrame
-    :param group_col: 分组变量
-    :param value_col: 数值变量
-    :return: 格式化的文本报告
-    """
-    # 1. 数据准备
-    groups = df[group_col].dropna().unique()
-    if len(groups) < 3:
-        return f"提示：分组变量 '{group_col}' 仅包含 {len(groups)} 个组别。建议使用 T检验 进行两组比较。"
-    
-    # 提取各组数据
-    group_data = []
-    group_names = []
-    for g in groups:
-        data = df[df[group_col] == g][value_col].dropna()
-        if len(data) < 2:
-            return f"错误：组别 '{g}' 的样本量过少 (<2)，无法进行分析。"
-        group_data.append(data)
-        group_names.append(g)
-        
-    # 2. 描述性统计
-    desc_stats = df.groupby(group_col)[value_col].agg(['count', 'mean', 'std']).reset_index()
-    
-    # 3. 方差齐性检验 (Levene Test)
-    stat_lev, p_lev = stats.levene(*group_data)
-    
-    # 4. ANOVA 主效应检验
-    f_stat, p_val = stats.f_oneway(*group_data)
-    
-    # 5. 事后检验 (Tukey HSD)
-    # 只有当ANOVA显著(p<0.05)时才推荐看事后检验，但为了完整性这里总是计算
-    tukey = pairwise_tukeyhsd(endog=df[value_col].dropna(), 
-                              groups=df[group_col].dropna(), 
-                              alpha=0.05)
-    
-    # 6. 生成报告
-    report = "=== 单因素方差分析结果 (One-way ANOVA) ===\n\n"
-    
-    report += "1. 描述性统计:\n"
-    report += desc_stats.to_string(index=False, float_format="%.2f") + "\n\n"
-    
-    report += "2. 方差齐性检验 (Levene's Test):\n"
-    report += f"   - F = {stat_lev:.3f}, p = {p_lev:.3f}\n"
-    if p_lev > 0.05:
-        report += "   - 结论: 方差齐性 (p > 0.05)，ANOVA结果可靠。\n\n"
-    else:
-        report += "   - 结论: 方差不齐 (p <= 0.05)，建议谨慎参考ANOVA结果或使用非参数检验(Kruskal-Wallis)。\n\n"
-        
-    report += "3. ANOVA 主效应检验:\n"
-    report += f"   - F = {f_stat:.3f}\n"
-    report += f"   - p = {p_val:.4f} " + ("(***)" if p_val < 0.001 else "(**)" if p_val < 0.01 else "(*)" if p_val < 0.05 else "(ns)") + "\n"
-    
-    if p_val < 0.05:
-        report += "   - 结论: 各组之间存在显著差异。\n\n"
-        
-        report += "4. Tukey HSD 事后多重比较:\n"
-        # 格式化Tukey结果
-        tukey_df = pd.DataFrame(data=tukey.summary().data[1:], columns=tukey.summary().data[0])
-        # 筛选出显著的行
-        sig_pairs = tukey_df[tukey_df['reject'] == True]
-        
-        if not sig_pairs.empty:
-            report += "   (仅显示存在显著差异的组对)\n"
-            for _, row in sig_pairs.iterrows():
-                report += f"   - {row['group1']} vs {row['group2']}: diff={row['meandiff']:.2f}, p={row['p-adj']:.4f}\n"
-        else:
-            report += "   (未发现两两之间存在显著差异)\n"
-            
-        report += "\n" + str(tukey.summary())
-    else:
-        report += "   - 结论: 各组之间未发现显著差异，无需进行事后检验。"
-        
-    return report
+import pandas as pd
+import numpy as np
+from scipy import stats
+
+from utils.helpers import sig_mark
+
+# Numba 可选依赖：JIT分组统计内核，没装则走pandas groupby，结果一致
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # cache=True 把编译结果落盘，首次点击编译一次，之后进程重启也不用重编
+    @njit(cache=True, fastmath=True)
+    def _group_stats(values, codes, k):
+        """单遍扫描按组编码累加，得到各组 count/mean/std(样本标准差)"""
+        counts = np.zeros(k, dtype=np.int64)
+        sums = np.zeros(k, dtype=np.float64)
+        sqsums = np.zeros(k, dtype=np.float64)
+        for i in range(values.shape[0]):
+            c = codes[i]
+            counts[c] += 1
+            sums[c] += values[i]
+            sqsums[c] += values[i] * values[i]
+        means = np.empty(k, dtype=np.float64)
+        stds = np.empty(k, dtype=np.float64)
+        for j in range(k):
+            if counts[j] > 0:
+                means[j] = sums[j] / counts[j]
+            else:
+                means[j] = np.nan
+            if counts[j] > 1:
+                var = (sqsums[j] - counts[j] * means[j] * means[j]) / (counts[j] - 1)
+                stds[j] = np.sqrt(var) if var > 0.0 else 0.0
+            else:
+                stds[j] = np.nan
+        return counts, means, stds
+
+def one_way_anova(df, group_col, value_col):
+    """
+    执行单因素方差分析 (One-way ANOVA)
+    :param df: DataFrame
+    :param group_col: 分组变量
+    :param value_col: 数值变量
+    :return: (格式化的文本报告, 关键统计量字典；无法分析时为None)
+    """
+    # 1. 数据准备：只取用到的两列各一次 (宽表上不反复走块管理器)，
+    #    factorize一次拿到 int64组编码 + float64数值 的连续数组，
+    #    之后分组统计和切分都在NumPy/Numba层做，不再按组别反复过滤DataFrame
+    gser = df[group_col]
+    vv = df[value_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    mask = gser.notna().to_numpy() & ~np.isnan(vv)
+    codes, group_names = pd.factorize(gser[mask])
+    values = np.ascontiguousarray(vv[mask])
+    k = len(group_names)
+    
+    if k < 3:
+        return f"提示：分组变量 '{group_col}' 仅包含 {k} 个组别。建议使用 T检验 进行两组比较。", None
+    
+    # 2. 描述性统计 (单遍JIT内核；没装numba时用bincount按组归并，口径相同)
+    codes = codes.astype(np.int64)
+    if njit is not None:
+        counts, means, stds = _group_stats(values, codes, k)
+    else:
+        counts = np.bincount(codes, minlength=k)
+        means = np.bincount(codes, weights=values, minlength=k) / counts
+        sqsums = np.bincount(codes, weights=values * values, minlength=k)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (sqsums - counts * means * means) / (counts - 1)
+        stds = np.where(counts > 1, np.sqrt(np.clip(var, 0.0, None)), np.nan)
+    
+    if counts.min() < 2:
+        g = group_names[int(np.argmin(counts))]
+        return f"错误：组别 '{g}' 的样本量过少 (<2)，无法进行分析。", None
+    
+    desc_stats = pd.DataFrame({group_col: group_names,
+                               'count': counts, 'mean': means, 'std': stds})
+    
+    # 按组编码稳定排序后一刀切出各组视图，代替逐组布尔过滤 (O(k*n) -> O(n log n))
+    order = np.argsort(codes, kind='stable')
+    group_data = np.split(values[order], np.cumsum(counts)[:-1])
+    
+    # 3. 方差齐性检验 (Levene Test)
+    stat_lev, p_lev = stats.levene(*group_data)
+    
+    # 4. ANOVA 主效应检验
+    f_stat, p_val = stats.f_oneway(*group_data)
+    
+    # 6. 生成报告
+    report = "=== 单因素方差分析结果 (One-way ANOVA) ===\n\n"
+    
+    report += "1. 描述性统计:\n"
+    report += desc_stats.to_string(index=False, float_format="%.2f") + "\n\n"
+    
+    report += "2. 方差齐性检验 (Levene's Test):\n"
+    report += f"   - F = {stat_lev:.3f}, p = {p_lev:.3f}\n"
+    if p_lev > 0.05:
+        report += "   - 结论: 方差齐性 (p > 0.05)，ANOVA结果可靠。\n\n"
+    else:
+        report += "   - 结论: 方差不齐 (p <= 0.05)，建议谨慎参考ANOVA结果或使用非参数检验(Kruskal-Wallis)。\n\n"
+        
+    report += "3. ANOVA 主效应检验:\n"
+    report += f"   - F = {f_stat:.3f}\n"
+    report += f"   - p = {p_val:.4f} " + sig_mark(p_val) + "\n"
+    
+    if p_val < 0.05:
+        report += "   - 结论: 各组之间存在显著差异。\n\n"
+        
+        # 5. 事后检验 (Tukey HSD)
+        # 只在主效应显著时才算，且改用 scipy.stats.tukey_hsd：直接给出
+        # p值矩阵，避开statsmodels路径里studentized-range ppf的慢速数值
+        # 反演，也不用再从 summary() 表格反解DataFrame；输入直接复用
+        # 前面切好的各组数组
+        tukey = stats.tukey_hsd(*group_data)
+        pmat = tukey.pvalue
+        
+        report += "4. Tukey HSD 事后多重比较:\n"
+        sig_lines = []
+        all_lines = []
+        for i in range(k):
+            for j in range(i + 1, k):
+                diff = means[j] - means[i]
+                line = f"   - {group_names[i]} vs {group_names[j]}: diff={diff:.2f}, p={pmat[i, j]:.4f}"
+                if pmat[i, j] < 0.05:
+                    sig_lines.append(line)
+                    all_lines.append(line + " (*)")
+                else:
+                    all_lines.append(line)
+        
+        if sig_lines:
+            report += "   (仅显示存在显著差异的组对)\n"
+            report += "\n".join(sig_lines) + "\n"
+        else:
+            report += "   (未发现两两之间存在显著差异)\n"
+            
+        report += "\n全部组对比较 (Tukey HSD, α=0.05):\n" + "\n".join(all_lines)
+    else:
+        report += "   - 结论: 各组之间未发现显著差异，无需进行事后检验。"
+        
+    # 返回关键统计量供调用方绘图复用：免去再跑一次 f_oneway，
+    # 柱状图的均值/标准误也直接用这里算好的，不必再groupby一遍
+    sems = stds / np.sqrt(counts)
+    return report, {'f': f_stat, 'p': p_val, 'levene_p': p_lev,
+                    'group_stats': (np.asarray(group_names), means, sems)}
@@ -1,54 +1,87 @@
-import pandas as pd
-import numpy as np
-
-def calculate_descriptive_stats(df):
-    """
-    计算描述性统计量
-    :param df: pandas DataFrame
-    :return: 格式化的文本报告
-    """
-    # 分离数值列和非数值列
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    object_cols = df.select_dtypes(include=['object', 'category']).columns
-    
-    report = "=== 描述性统计报告 ===\n\n"
-    
-    # 1. 数值变量统计
-    if len(numeric_cols) > 0:
-        report += "--- 数值变量统计 ---\n"
-        stats = df[numeric_cols].describe().T
-        # 添加更多统计量 if needed, describe已经包含count, mean, std, min, 25%, 50%, 75%, max
-        
-        # 格式化输出
-        # 使用pandas to_markdown (需要安装tabulate) 或者手动格式化
-        # 这里手动简单的格式化，避免额外依赖
-        
-        header = f"{'变量名':<15} {'N':<6} {'均值':<10} {'标准差':<10} {'最小值':<10} {'最大值':<10}\n"
-        report += header
-        report += "-" * len(header) + "\n"
-        
-        for idx, row in stats.iterrows():
-            # 截断过长的变量名
-            name = str(idx)
-            if len(name) > 12: name = name[:12] + ".."
-            
-            line = f"{name:<15} {int(row['count']):<6} {row['mean']:.2f}      {row['std']:.2f}      {row['min']:.2f}      {row['max']:.2f}\n"
-            report += line
-        report += "\n"
-        
-    # 2. 分类变量统计
-    if len(object_cols) > 0:
-        report += "--- 分类变量统计 (频数/百分比) ---\n"
-        for col in object_cols:
-            report += f"\n变量: {col}\n"
-            counts = df[col].value_counts()
-            total = len(df)
-            
-            for category, count in counts.items():
-                pct = (count / total) * 100
-                report += f"  - {category}: {count} ({pct:.1f}%)\n"
-                
-    if len(numeric_cols) == 0 and len(object_cols) == 0:
-        report += "未检测到有效数据列。\n"
-        
-    return report
+import warnings
+
+import pandas as pd
+import numpy as np
+from scipy import stats as scipy_stats
+
+
+def check_normality_batch(X):
+    """
+    对2D数组的所有列一次性做正态性检验 (D'Agostino K²)
+    一次C层axis调用替代逐列Python循环；样本量不足以检验时返回None。
+    :param X: (n, k) ndarray
+    :return: 长度k的布尔数组 (p > 0.05)，或 None
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            _, p = scipy_stats.normaltest(X, axis=0, nan_policy='omit')
+        return p > 0.05
+    except Exception:
+        return None
+
+def calculate_descriptive_stats(df):
+    """
+    计算描述性统计量
+    :param df: pandas DataFrame
+    :return: 格式化的文本报告
+    """
+    # 分离数值列和非数值列
+    # 只需要列名，直接扫一遍 dtypes 即可，不必让 select_dtypes 构建两个新的DataFrame视图
+    numeric_cols = []
+    object_cols = []
+    for col, dt in df.dtypes.items():
+        if pd.api.types.is_numeric_dtype(dt) and not pd.api.types.is_bool_dtype(dt):
+            numeric_cols.append(col)
+        elif pd.api.types.is_object_dtype(dt) or isinstance(dt, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dt):
+            object_cols.append(col)
+    
+    report = "=== 描述性统计报告 ===\n\n"
+    
+    # 1. 数值变量统计
+    if len(numeric_cols) > 0:
+        report += "--- 数值变量统计 ---\n"
+        stats = df[numeric_cols].describe().T
+        # 添加更多统计量 if needed, describe已经包含count, mean, std, min, 25%, 50%, 75%, max
+        
+        # 格式化输出
+        # 使用pandas to_markdown (需要安装tabulate) 或者手动格式化
+        # 这里手动简单的格式化，避免额外依赖
+        
+        # 所有数值列的正态性一次批量检验，不逐列调用
+        norm_ok = check_normality_batch(df[numeric_cols].to_numpy(dtype=np.float64))
+        norm_marks = (["-"] * len(numeric_cols) if norm_ok is None
+                      else ["是" if ok else "否" for ok in norm_ok])
+        
+        header = f"{'变量名':<15} {'N':<6} {'均值':<10} {'标准差':<10} {'最小值':<10} {'最大值':<10} {'正态性':<8}\n"
+        report += header
+        report += "-" * len(header) + "\n"
+        
+        # 一次取出ndarray后推导式拼行，避开iterrows逐行构造Series的开销
+        arr = stats[['count', 'mean', 'std', 'min', 'max']].to_numpy()
+        names = [str(idx) if len(str(idx)) <= 12 else str(idx)[:12] + ".."
+                 for idx in stats.index]
+        report += "".join(
+            f"{name:<15} {int(a[0]):<6} {a[1]:.2f}      {a[2]:.2f}      {a[3]:.2f}      {a[4]:.2f}      {mark}\n"
+            for name, a, mark in zip(names, arr, norm_marks)
+        )
+        report += "\n"
+        
+    # 2. 分类变量统计
+    if len(object_cols) > 0:
+        report += "--- 分类变量统计 (频数/百分比) ---\n"
+        total = len(df)
+        for col in object_cols:
+            report += f"\n变量: {col}\n"
+            counts = df[col].value_counts()
+            # 百分比整列一次算完，循环里只做格式化
+            pcts = counts.to_numpy() * (100.0 / total)
+            report += "".join(
+                f"  - {category}: {count} ({pct:.1f}%)\n"
+                for category, count, pct in zip(counts.index, counts.to_numpy(), pcts)
+            )
+                
+    if len(numeric_cols) == 0 and len(object_cols) == 0:
+        report += "未检测到有效数据列。\n"
+        
+    return report
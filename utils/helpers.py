@@ -1,16 +1,35 @@
-import sys
-import os
-
-def resource_path(relative_path):
-    """ 
-    获取资源的绝对路径
-    用于解决 PyInstaller 打包后，资源文件被解压到临时目录(sys._MEIPASS)找不到的问题
-    """
-    try:
-        # PyInstaller 创建临时文件夹，将路径存储在 _MEIPASS 中
-        base_path = sys._MEIPASS
-    except Exception:
-        # 正常运行模式
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
+import sys
+import os
+import functools
+
+import numpy as np
+
+# 显著性标记：阈值表 + searchsorted 一次定位，替代各处链式三元比较；
+# p 传数组时自动向量化，批量打标是O(N)的NumPy操作
+_P_THRESH = np.array([0.001, 0.01, 0.05])
+_P_MARKS = np.array(["(***)", "(**)", "(*)", "(ns)"])
+
+
+def sig_mark(p):
+    """
+    把P值转成显著性标记 (***/**/*/ns)
+    :param p: 标量或ndarray
+    :return: 对应的标记字符串 (或字符串数组)
+    """
+    idx = np.searchsorted(_P_THRESH, p, side='right')
+    if np.isscalar(idx):
+        return str(_P_MARKS[idx])
+    return _P_MARKS[idx]
+
+# PyInstaller 打包运行时资源被解压到临时目录(sys._MEIPASS)；
+# 基准路径进程内不会变，导入时定一次即可，不必每次取资源都判断+getcwd
+_BASE_PATH = getattr(sys, '_MEIPASS', None) or os.path.abspath(".")
+
+@functools.lru_cache(maxsize=256)
+def resource_path(relative_path):
+    """ 
+    获取资源的绝对路径
+    用于解决 PyInstaller 打包后，资源文件被解压到临时目录(sys._MEIPASS)找不到的问题
+    同一路径重复取直接命中缓存。
+    """
+    return os.path.join(_BASE_PATH, relative_path)